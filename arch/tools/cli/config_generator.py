@@ -1,37 +1,208 @@
+import hashlib
 import json
+import logging
 import os
-from jinja2 import Environment, FileSystemLoader
-import yaml
-from jsonschema import validate
-from urllib.parse import urlparse
+import re
+import shutil
+import stat
+import sys
+import tempfile
+from types import MappingProxyType
+
+# jinja2, yaml and jsonschema are imported lazily where they are used, so that
+# runs which exit early or are served from a cache don't pay for the imports
+
+
+SUPPORTED_PROVIDERS = frozenset(
+    {
+        "arch",
+        "claude",
+        "deepseek",
+        "groq",
+        "mistral",
+        "openai",
+        "gemini",
+    }
+)
+_SUPPORTED_PROVIDERS_STR = ", ".join(sorted(SUPPORTED_PROVIDERS))
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# scheme://[userinfo@]host[:port][path], where host may be a bracketed ipv6 address
+_BASE_URL_RE = re.compile(
+    r"^(?P<scheme>[A-Za-z][A-Za-z0-9+.-]*)://(?:[^@/?#]*@)?"
+    r"(?:\[(?P<ipv6>[^\]]+)\]|(?P<host>[^:/?#]+))"
+    r"(?::(?P<port>[^/?#]*))?(?P<path>[^?#]*)"
+)
+
+# shared read-only default for optional config sections
+_EMPTY = MappingProxyType({})
+
+_PROMPT_GATEWAY_LISTENER_DEFAULTS = (
+    ("port", 10000),
+    ("address", "127.0.0.1"),
+    ("timeout", "10s"),
+)
+_LLM_GATEWAY_LISTENER_DEFAULTS = (
+    ("port", 12000),
+    ("address", "127.0.0.1"),
+    ("timeout", "10s"),
+)
+
+log = logging.getLogger(__name__)
+
+# compiled schema validators, keyed by the raw schema source so that a schema
+# is only parsed, checked and compiled once per process
+_validator_cache = {}
+
+# jinja environments, keyed by template root so compiled templates are reused
+_jinja_envs = {}
 
+# signature of the inputs and outputs of the last successful render, used to
+# skip re-rendering in the same process when nothing has changed
+_input_sig = None
 
-SUPPORTED_PROVIDERS = [
-    "arch",
-    "claude",
-    "deepseek",
-    "groq",
-    "mistral",
-    "openai",
-    "gemini",
-]
+# signature of each envoy template when it was last loaded into its jinja env
+_template_sigs = {}
 
 
 def get_endpoint_and_port(endpoint, protocol):
-    endpoint_tokens = endpoint.split(":")
-    if len(endpoint_tokens) > 1:
-        endpoint = endpoint_tokens[0]
-        port = int(endpoint_tokens[1])
-        return endpoint, port
-    else:
-        if protocol == "http":
-            port = 80
-        else:
-            port = 443
-        return endpoint, port
+    host, sep, port = endpoint.rpartition(":")
+    if sep:
+        return host, int(port)
+    return endpoint, _DEFAULT_PORTS.get(protocol, 443)
+
+
+def load_yaml(stream):
+    import yaml
+
+    # prefer the libyaml backed C loader when available
+    return yaml.load(stream, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def dump_yaml(data):
+    import yaml
+
+    return yaml.dump(
+        data,
+        Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+        sort_keys=False,
+        default_flow_style=False,
+    )
+
+
+def get_jinja_env(template_root):
+    env = _jinja_envs.get(template_root)
+    if env is None:
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+        try:
+            # jinja's default cache directory is private to the current user
+            bytecode_cache = FileSystemBytecodeCache(pattern="archgw_jinja_%s.cache")
+        except (OSError, RuntimeError) as e:
+            log.warning("jinja bytecode cache disabled: %s", e)
+            bytecode_cache = None
+
+        env = Environment(
+            loader=FileSystemLoader(template_root),
+            auto_reload=False,
+            cache_size=64,
+            bytecode_cache=bytecode_cache,
+        )
+        _jinja_envs[template_root] = env
+    return env
+
+
+def get_input_signature(paths):
+    try:
+        return tuple(
+            (path, st.st_mtime_ns, st.st_size)
+            for path, st in ((path, os.stat(path)) for path in paths)
+        )
+    except OSError:
+        return None
+
+
+def get_render_cache_key(arch_config, arch_config_schema, template_path):
+    # the generator source is part of the key so that cached output is not
+    # reused after the rendering logic changes
+    with open(template_path, "rb") as file:
+        template_source = file.read()
+    with open(__file__, "rb") as file:
+        generator_source = file.read()
+
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in (
+        arch_config,
+        arch_config_schema,
+        template_source,
+        generator_source,
+        template_path.encode(),
+    ):
+        # length prefix each part so that different splits never collide
+        hasher.update(len(part).to_bytes(8, "little"))
+        hasher.update(part)
+    return hasher.hexdigest()
+
+
+def load_rendered_from_cache(cache_dir, key, envoy_config_file, arch_config_file):
+    cached_envoy_config = os.path.join(cache_dir, f"{key}.envoy.yaml")
+    cached_arch_config = os.path.join(cache_dir, f"{key}.arch_rendered.yaml")
+    if not (os.path.isfile(cached_envoy_config) and os.path.isfile(cached_arch_config)):
+        return False
+    try:
+        shutil.copyfile(cached_envoy_config, envoy_config_file)
+        shutil.copyfile(cached_arch_config, arch_config_file)
+    except OSError as e:
+        log.warning("failed to restore rendered config from cache: %s", e)
+        return False
+    return True
+
+
+def get_private_cache_dir(cache_dir):
+    # cached output is copied over the envoy config without validation, so only
+    # use a directory that no other user can write to (same checks as jinja's
+    # default bytecode cache directory)
+    try:
+        os.mkdir(cache_dir, 0o700)
+    except FileExistsError:
+        pass
+    except OSError as e:
+        log.warning("render cache disabled, failed to create %s: %s", cache_dir, e)
+        return None
+
+    st = os.lstat(cache_dir)
+    if (
+        not stat.S_ISDIR(st.st_mode)
+        or st.st_uid != os.getuid()
+        or st.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+    ):
+        log.warning(
+            "render cache disabled, %s must be a directory owned by the current user with mode 0700",
+            cache_dir,
+        )
+        return None
+    return cache_dir
+
+
+def store_rendered_in_cache(cache_dir, key, envoy_config_file, arch_config_file):
+    try:
+        for src, suffix in (
+            (envoy_config_file, "envoy.yaml"),
+            (arch_config_file, "arch_rendered.yaml"),
+        ):
+            # copy to a temp file first so readers never see a partial entry
+            dst = os.path.join(cache_dir, f"{key}.{suffix}")
+            tmp = f"{dst}.{os.getpid()}.tmp"
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, dst)
+    except OSError as e:
+        log.warning("failed to store rendered config in cache: %s", e)
 
 
 def validate_and_render_schema():
+    global _input_sig
+
     ENVOY_CONFIG_TEMPLATE_FILE = os.getenv(
         "ENVOY_CONFIG_TEMPLATE_FILE", "envoy.template.yaml"
     )
@@ -45,43 +216,102 @@ def validate_and_render_schema():
     ARCH_CONFIG_SCHEMA_FILE = os.getenv(
         "ARCH_CONFIG_SCHEMA_FILE", "arch_config_schema.yaml"
     )
+    TEMPLATE_ROOT = os.getenv("TEMPLATE_ROOT", "./")
+    # set to an empty string to disable caching of rendered output
+    RENDER_CACHE_DIR = os.getenv(
+        "ARCHGW_RENDER_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), f"archgw-render-cache-{os.getuid()}"),
+    )
+    template_path = os.path.join(TEMPLATE_ROOT, ENVOY_CONFIG_TEMPLATE_FILE)
 
-    env = Environment(loader=FileSystemLoader(os.getenv("TEMPLATE_ROOT", "./")))
-    template = env.get_template(ENVOY_CONFIG_TEMPLATE_FILE)
+    input_sig = get_input_signature(
+        (ARCH_CONFIG_FILE, ARCH_CONFIG_SCHEMA_FILE, template_path)
+    )
+    if input_sig is not None:
+        input_sig = (input_sig, ENVOY_CONFIG_FILE_RENDERED, ARCH_CONFIG_FILE_RENDERED)
+        if (
+            input_sig == _input_sig
+            and os.path.exists(ENVOY_CONFIG_FILE_RENDERED)
+            and os.path.exists(ARCH_CONFIG_FILE_RENDERED)
+        ):
+            log.debug("inputs unchanged since last render, skipping")
+            return
 
     try:
-        validate_prompt_config(ARCH_CONFIG_FILE, ARCH_CONFIG_SCHEMA_FILE)
-    except Exception as e:
-        print(str(e))
-        exit(1)  # validate_prompt_config failed. Exit
+        with open(ARCH_CONFIG_FILE, "rb") as file:
+            arch_config = file.read()
 
-    with open(ARCH_CONFIG_FILE, "r") as file:
-        arch_config = file.read()
+        with open(ARCH_CONFIG_SCHEMA_FILE, "rb") as file:
+            arch_config_schema = file.read()
+    except OSError as e:
+        print(
+            f"Error reading arch_config file: {ARCH_CONFIG_FILE}, schema file: {ARCH_CONFIG_SCHEMA_FILE}, error: {e}"
+        )
+        sys.exit(1)
+
+    # a cache hit skips the cluster and rendered config debug dumps, so the
+    # cache is not used when debug logging is on
+    if log.isEnabledFor(logging.DEBUG):
+        RENDER_CACHE_DIR = ""
+
+    render_cache_key = None
+    if RENDER_CACHE_DIR:
+        RENDER_CACHE_DIR = get_private_cache_dir(RENDER_CACHE_DIR)
+    if RENDER_CACHE_DIR:
+        render_cache_key = get_render_cache_key(
+            arch_config, arch_config_schema, template_path
+        )
+        if load_rendered_from_cache(
+            RENDER_CACHE_DIR,
+            render_cache_key,
+            ENVOY_CONFIG_FILE_RENDERED,
+            ARCH_CONFIG_FILE_RENDERED,
+        ):
+            log.debug("using cached rendered config %s", render_cache_key)
+            _input_sig = input_sig
+            return
+
+    env = get_jinja_env(TEMPLATE_ROOT)
+    # the env is created with auto_reload off, so drop its compiled templates
+    # when the template file changed since it was last loaded in this process
+    template_sig = input_sig[0][2] if input_sig is not None else None
+    if template_sig is None or _template_sigs.get(template_path) != template_sig:
+        env.cache.clear()
+        _template_sigs[template_path] = template_sig
+    template = env.get_template(ENVOY_CONFIG_TEMPLATE_FILE)
 
-    with open(ARCH_CONFIG_SCHEMA_FILE, "r") as file:
-        arch_config_schema = file.read()
+    try:
+        config_yaml = load_yaml(arch_config)
+        validate_prompt_config(config_yaml, arch_config_schema)
+    except Exception as e:
+        print(
+            f"Error validating arch_config file: {ARCH_CONFIG_FILE}, schema file: {ARCH_CONFIG_SCHEMA_FILE}, error: {e}"
+        )
+        sys.exit(1)  # validate_prompt_config failed. Exit
 
-    config_yaml = yaml.safe_load(arch_config)
-    _ = yaml.safe_load(arch_config_schema)
     inferred_clusters = {}
 
-    endpoints = config_yaml.get("endpoints", {})
+    endpoints = config_yaml.get("endpoints") or _EMPTY
 
     # override the inferred clusters with the ones defined in the config
     for name, endpoint_details in endpoints.items():
-        inferred_clusters[name] = endpoint_details
-        endpoint = inferred_clusters[name]["endpoint"]
-        protocol = inferred_clusters[name].get("protocol", "http")
-        (
-            inferred_clusters[name]["endpoint"],
-            inferred_clusters[name]["port"],
-        ) = get_endpoint_and_port(endpoint, protocol)
-
-    print("defined clusters from arch_config.yaml: ", json.dumps(inferred_clusters))
+        endpoint, port = get_endpoint_and_port(
+            endpoint_details["endpoint"], endpoint_details.get("protocol", "http")
+        )
+        inferred_clusters[name] = {
+            **endpoint_details,
+            "endpoint": endpoint,
+            "port": port,
+        }
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(
+            "defined clusters from arch_config.yaml: %s", json.dumps(inferred_clusters)
+        )
 
     if "prompt_targets" in config_yaml:
         for prompt_target in config_yaml["prompt_targets"]:
-            name = prompt_target.get("endpoint", {}).get("name", None)
+            name = (prompt_target.get("endpoint") or _EMPTY).get("name")
             if not name:
                 continue
             if name not in inferred_clusters:
@@ -89,49 +319,54 @@ def validate_and_render_schema():
                     f"Unknown endpoint {name}, please add it in endpoints section in your arch_config.yaml file"
                 )
 
-    arch_tracing = config_yaml.get("tracing", {})
+    arch_tracing = config_yaml.get("tracing") or _EMPTY
 
     llms_with_endpoint = []
 
-    updated_llm_providers = []
+    # providers are validated and updated in place, so the parsed list is reused
+    # as is and only the implicit arch-router provider is appended to it
+    llm_providers = config_yaml["llm_providers"]
     llm_provider_name_set = set()
     llms_with_usage = []
+    # names and model ids share one namespace, like LlmProviders in the gateway
     model_name_keys = set()
     model_usage_name_keys = set()
-    for llm_provider in config_yaml["llm_providers"]:
-        if llm_provider.get("usage", None):
-            llms_with_usage.append(llm_provider["name"])
-        if llm_provider.get("name") in llm_provider_name_set:
+    for llm_provider in llm_providers:
+        name = llm_provider.get("name")
+        model_name = llm_provider.get("model")
+        base_url = llm_provider.get("base_url")
+        provider_interface = llm_provider.get("provider_interface")
+        usage = llm_provider.get("usage")
+        routing_prefs = llm_provider.get("routing_preferences") or ()
+
+        if usage:
+            llms_with_usage.append(name)
+        if name in llm_provider_name_set:
             raise Exception(
-                f"Duplicate llm_provider name {llm_provider.get('name')}, please provide unique name for each llm_provider"
+                f"Duplicate llm_provider name {name}, please provide unique name for each llm_provider"
             )
 
-        model_name = llm_provider.get("model")
         if model_name in model_name_keys:
             raise Exception(
                 f"Duplicate model name {model_name}, please provide unique model name for each llm_provider"
             )
         model_name_keys.add(model_name)
-        if llm_provider.get("name") is None:
-            llm_provider["name"] = model_name
+        if name is None:
+            name = model_name
+            llm_provider["name"] = name
 
-        model_name_tokens = model_name.split("/")
-        if len(model_name_tokens) < 2:
+        provider, sep, model_id = model_name.partition("/")
+        if not sep or not model_id:
             raise Exception(
                 f"Invalid model name {model_name}. Please provide model name in the format <provider>/<model_id>."
             )
-        provider = model_name_tokens[0]
-        model_id = "/".join(model_name_tokens[1:])
         if provider not in SUPPORTED_PROVIDERS:
-            if (
-                llm_provider.get("base_url", None) is None
-                or llm_provider.get("provider_interface", None) is None
-            ):
+            if base_url is None or provider_interface is None:
                 raise Exception(
-                    f"Must provide base_url and provider_interface for unsupported provider {provider} for model {model_name}. Supported providers are: {', '.join(SUPPORTED_PROVIDERS)}"
+                    f"Must provide base_url and provider_interface for unsupported provider {provider} for model {model_name}. Supported providers are: {_SUPPORTED_PROVIDERS_STR}"
                 )
-            provider = llm_provider.get("provider_interface", None)
-        elif llm_provider.get("provider_interface", None) is not None:
+            provider = provider_interface
+        elif provider_interface is not None:
             raise Exception(
                 f"Please provide provider interface as part of model name {model_name} using the format <provider>/<model_id>. For example, use 'openai/gpt-3.5-turbo' instead of 'gpt-3.5-turbo' "
             )
@@ -142,16 +377,17 @@ def validate_and_render_schema():
             )
         model_name_keys.add(model_id)
 
-        for routing_preference in llm_provider.get("routing_preferences", []):
-            if routing_preference.get("name") in model_usage_name_keys:
+        for routing_preference in routing_prefs:
+            route_name = routing_preference.get("name")
+            if route_name in model_usage_name_keys:
                 raise Exception(
-                    f"Duplicate routing preference name \"{routing_preference.get('name')}\", please provide unique name for each routing preference"
+                    f'Duplicate routing preference name "{route_name}", please provide unique name for each routing preference'
                 )
-            model_usage_name_keys.add(routing_preference.get("name"))
+            model_usage_name_keys.add(route_name)
 
         llm_provider["model"] = model_id
         llm_provider["provider_interface"] = provider
-        llm_provider_name_set.add(llm_provider.get("name"))
+        llm_provider_name_set.add(name)
         provider = None
         if llm_provider.get("provider") and llm_provider.get("provider_interface"):
             raise Exception(
@@ -161,81 +397,70 @@ def validate_and_render_schema():
             provider = llm_provider["provider"]
             llm_provider["provider_interface"] = provider
             del llm_provider["provider"]
-        updated_llm_providers.append(llm_provider)
 
-        if llm_provider.get("base_url", None):
-            base_url = llm_provider["base_url"]
-            urlparse_result = urlparse(base_url)
-            url_path = urlparse_result.path
-            if url_path and url_path != "/":
+        if base_url:
+            match = _BASE_URL_RE.match(base_url)
+            if match is not None and match.group("path") not in ("", "/"):
                 raise Exception(
                     f"Please provide base_url without path, got {base_url}. Use base_url like 'http://example.com' instead of 'http://example.com/path'."
                 )
-            if urlparse_result.scheme == "" or urlparse_result.scheme not in [
-                "http",
-                "https",
-            ]:
+            protocol = match.group("scheme").lower() if match is not None else ""
+            if protocol not in _DEFAULT_PORTS:
                 raise Exception(
                     "Please provide a valid URL with scheme (http/https) in base_url"
                 )
-            protocol = urlparse_result.scheme
-            port = urlparse_result.port
-            if port is None:
-                if protocol == "http":
-                    port = 80
-                else:
-                    port = 443
-            endpoint = urlparse_result.hostname
+            port = match.group("port")
+            if not port:
+                port = _DEFAULT_PORTS[protocol]
+            elif port.isascii() and port.isdigit() and int(port) <= 65535:
+                port = int(port)
+            else:
+                raise Exception(
+                    f"Please provide a valid port (0-65535) in base_url, got {base_url}"
+                )
+            endpoint = (match.group("ipv6") or match.group("host")).lower()
             llm_provider["endpoint"] = endpoint
             llm_provider["port"] = port
             llm_provider["protocol"] = protocol
             llms_with_endpoint.append(llm_provider)
 
     if len(model_usage_name_keys) > 0:
-        routing_llm_provider = config_yaml.get("routing", {}).get("llm_provider", None)
+        routing = config_yaml.get("routing") or _EMPTY
+        routing_llm_provider = routing.get("llm_provider")
         if routing_llm_provider and routing_llm_provider not in llm_provider_name_set:
             raise Exception(
                 f"Routing llm_provider {routing_llm_provider} is not defined in llm_providers"
             )
         if routing_llm_provider is None and "arch-router" not in llm_provider_name_set:
-            updated_llm_providers.append(
+            llm_providers.append(
                 {
                     "name": "arch-router",
                     "provider_interface": "arch",
-                    "model": config_yaml.get("routing", {}).get("model", "Arch-Router"),
+                    "model": routing.get("model", "Arch-Router"),
                 }
             )
 
-    config_yaml["llm_providers"] = updated_llm_providers
+    # the same string is embedded in the envoy config and written to
+    # ARCH_CONFIG_FILE_RENDERED, so it is serialized once up front
+    arch_config_string = dump_yaml(config_yaml)
+    arch_llm_config_string = arch_config_string
 
-    arch_config_string = yaml.dump(config_yaml)
-    arch_llm_config_string = yaml.dump(config_yaml)
+    listeners = config_yaml.get("listeners") or _EMPTY
+    # listener defaults are filled in place, so a missing listener gets its own dict
+    prompt_gateway_listener = listeners.get("ingress_traffic") or {}
+    for key, value in _PROMPT_GATEWAY_LISTENER_DEFAULTS:
+        prompt_gateway_listener.setdefault(key, value)
 
-    prompt_gateway_listener = config_yaml.get("listeners", {}).get(
-        "ingress_traffic", {}
-    )
-    if prompt_gateway_listener.get("port") == None:
-        prompt_gateway_listener["port"] = 10000  # default port for prompt gateway
-    if prompt_gateway_listener.get("address") == None:
-        prompt_gateway_listener["address"] = "127.0.0.1"
-    if prompt_gateway_listener.get("timeout") == None:
-        prompt_gateway_listener["timeout"] = "10s"
-
-    llm_gateway_listener = config_yaml.get("listeners", {}).get("egress_traffic", {})
-    if llm_gateway_listener.get("port") == None:
-        llm_gateway_listener["port"] = 12000  # default port for llm gateway
-    if llm_gateway_listener.get("address") == None:
-        llm_gateway_listener["address"] = "127.0.0.1"
-    if llm_gateway_listener.get("timeout") == None:
-        llm_gateway_listener["timeout"] = "10s"
-
-    use_agent_orchestrator = config_yaml.get("overrides", {}).get(
-        "use_agent_orchestrator", False
-    )
+    llm_gateway_listener = listeners.get("egress_traffic") or {}
+    for key, value in _LLM_GATEWAY_LISTENER_DEFAULTS:
+        llm_gateway_listener.setdefault(key, value)
+
+    overrides = config_yaml.get("overrides") or _EMPTY
+    use_agent_orchestrator = overrides.get("use_agent_orchestrator", False)
 
     agent_orchestrator = None
     if use_agent_orchestrator:
-        print("Using agent orchestrator")
+        log.info("Using agent orchestrator")
 
         if len(endpoints) == 0:
             raise Exception(
@@ -248,7 +473,7 @@ def validate_and_render_schema():
         else:
             agent_orchestrator = list(endpoints.keys())[0]
 
-    print("agent_orchestrator: ", agent_orchestrator)
+    log.debug("agent_orchestrator: %s", agent_orchestrator)
 
     data = {
         "prompt_gateway_listener": prompt_gateway_listener,
@@ -256,40 +481,74 @@ def validate_and_render_schema():
         "arch_config": arch_config_string,
         "arch_llm_config": arch_llm_config_string,
         "arch_clusters": inferred_clusters,
-        "arch_llm_providers": config_yaml["llm_providers"],
+        "arch_llm_providers": llm_providers,
         "arch_tracing": arch_tracing,
         "local_llms": llms_with_endpoint,
         "agent_orchestrator": agent_orchestrator,
     }
 
-    rendered = template.render(data)
-    print(ENVOY_CONFIG_FILE_RENDERED)
-    print(rendered)
-    with open(ENVOY_CONFIG_FILE_RENDERED, "w") as file:
-        file.write(rendered)
+    # render into a temp file next to the output and move it into place, so a
+    # failed render never leaves a truncated envoy config behind
+    envoy_config_tmp = f"{ENVOY_CONFIG_FILE_RENDERED}.{os.getpid()}.tmp"
+    try:
+        with open(envoy_config_tmp, "w") as file:
+            if log.isEnabledFor(logging.DEBUG):
+                # the debug dump needs the whole string, so render it once for both
+                rendered = template.render(data)
+                log.debug("rendered %s:\n%s", ENVOY_CONFIG_FILE_RENDERED, rendered)
+                file.write(rendered)
+            else:
+                # stream the template into the file instead of building the whole string
+                template.stream(data).dump(file)
+        os.replace(envoy_config_tmp, ENVOY_CONFIG_FILE_RENDERED)
+    except BaseException:
+        try:
+            os.remove(envoy_config_tmp)
+        except OSError:
+            pass
+        raise
 
     with open(ARCH_CONFIG_FILE_RENDERED, "w") as file:
         file.write(arch_config_string)
 
+    if render_cache_key:
+        store_rendered_in_cache(
+            RENDER_CACHE_DIR,
+            render_cache_key,
+            ENVOY_CONFIG_FILE_RENDERED,
+            ARCH_CONFIG_FILE_RENDERED,
+        )
 
-def validate_prompt_config(arch_config_file, arch_config_schema_file):
-    with open(arch_config_file, "r") as file:
-        arch_config = file.read()
+    _input_sig = input_sig
 
-    with open(arch_config_schema_file, "r") as file:
-        arch_config_schema = file.read()
 
-    config_yaml = yaml.safe_load(arch_config)
-    config_schema_yaml = yaml.safe_load(arch_config_schema)
+def validate_prompt_config(config_yaml, arch_config_schema):
+    validator = get_schema_validator(arch_config_schema)
+    # fail fast on the first error instead of collecting all of them
+    error = next(validator.iter_errors(config_yaml), None)
+    if error is not None:
+        raise error
 
-    try:
-        validate(config_yaml, config_schema_yaml)
-    except Exception as e:
-        print(
-            f"Error validating arch_config file: {arch_config_file}, schema file: {arch_config_schema_file}, error: {e}"
-        )
-        raise e
+
+def get_schema_validator(schema_source):
+    validator = _validator_cache.get(schema_source)
+    if validator is None:
+        from jsonschema.validators import validator_for
+
+        # the schema is only parsed when there is no compiled validator for it
+        schema = load_yaml(schema_source)
+        cls = validator_for(schema)
+        cls.check_schema(schema)
+        validator = cls(schema)
+        _validator_cache[schema_source] = validator
+    return validator
 
 
 if __name__ == "__main__":
+    # set ARCHGW_VERBOSE to dump the inferred clusters and rendered envoy config,
+    # this also bypasses the render cache (see README.md)
+    logging.basicConfig(
+        level=logging.DEBUG if os.getenv("ARCHGW_VERBOSE") else logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
     validate_and_render_schema()
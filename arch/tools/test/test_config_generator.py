@@ -1,7 +1,19 @@
 import pytest
+import logging
+import stat
+import yaml
 from unittest import mock
 import sys
-from cli.config_generator import validate_and_render_schema
+from jsonschema import ValidationError
+from cli import config_generator
+from cli.config_generator import (
+    get_endpoint_and_port,
+    get_jinja_env,
+    get_private_cache_dir,
+    get_schema_validator,
+    validate_and_render_schema,
+    validate_prompt_config,
+)
 
 # Patch sys.path to allow import from cli/
 import os
@@ -25,6 +37,7 @@ def test_validate_and_render_happy_path(monkeypatch):
     monkeypatch.setenv("ARCH_CONFIG_FILE_RENDERED", "fake_arch_config_rendered.yaml")
     monkeypatch.setenv("ENVOY_CONFIG_FILE_RENDERED", "fake_envoy.yaml")
     monkeypatch.setenv("TEMPLATE_ROOT", "../")
+    monkeypatch.setenv("ARCHGW_RENDER_CACHE_DIR", "")
 
     arch_config = """
 version: v0.1.0
@@ -64,11 +77,6 @@ tracing:
     m_open = mock.mock_open()
     # Provide enough file handles for all open() calls in validate_and_render_schema
     m_open.side_effect = [
-        mock.mock_open(read_data="").return_value,
-        mock.mock_open(read_data=arch_config).return_value,  # ARCH_CONFIG_FILE
-        mock.mock_open(
-            read_data=arch_config_schema
-        ).return_value,  # ARCH_CONFIG_SCHEMA_FILE
         mock.mock_open(read_data=arch_config).return_value,  # ARCH_CONFIG_FILE
         mock.mock_open(
             read_data=arch_config_schema
@@ -77,8 +85,12 @@ tracing:
         mock.mock_open().return_value,  # ARCH_CONFIG_FILE_RENDERED (write)
     ]
     with mock.patch("builtins.open", m_open):
-        with mock.patch("config_generator.Environment"):
-            validate_and_render_schema()
+        with mock.patch("cli.config_generator.get_jinja_env"):
+            with mock.patch("os.replace") as m_replace:
+                validate_and_render_schema()
+            m_replace.assert_called_once_with(
+                f"fake_envoy.yaml.{os.getpid()}.tmp", "fake_envoy.yaml"
+            )
 
 
 arch_config_test_cases = [
@@ -148,6 +160,49 @@ llm_providers:
 
   - model: mistral/gpt-4o
 
+""",
+    },
+    {
+        "id": "model_name_without_model_id",
+        "expected_error": "Invalid model name openai/",
+        "arch_config": """
+version: v0.1.0
+
+listeners:
+  egress_traffic:
+    address: 0.0.0.0
+    port: 12000
+    message_format: openai
+    timeout: 30s
+
+llm_providers:
+
+  - model: openai/
+
+""",
+    },
+    {
+        "id": "model_id_collides_with_model_name",
+        "expected_error": "Duplicate model_id openai/gpt-4o",
+        "arch_config": """
+version: v0.1.0
+
+listeners:
+  egress_traffic:
+    address: 0.0.0.0
+    port: 12000
+    message_format: openai
+    timeout: 30s
+
+llm_providers:
+
+  - model: openai/gpt-4o
+    access_key: $OPENAI_API_KEY
+
+  - model: custom/openai/gpt-4o
+    base_url: "http://custom.com"
+    provider_interface: openai
+
 """,
     },
     {
@@ -188,6 +243,90 @@ llm_providers:
     base_url: "http://custom.com/test"
     provider_interface: openai
 
+""",
+    },
+    {
+        "id": "base_url_invalid_scheme",
+        "expected_error": "Please provide a valid URL with scheme (http/https) in base_url",
+        "arch_config": """
+version: v0.1.0
+
+listeners:
+  egress_traffic:
+    address: 0.0.0.0
+    port: 12000
+    message_format: openai
+    timeout: 30s
+
+llm_providers:
+
+  - model: custom/gpt-4o
+    base_url: "ftp://custom.com"
+    provider_interface: openai
+
+""",
+    },
+    {
+        "id": "base_url_port_out_of_range",
+        "expected_error": "Please provide a valid port (0-65535) in base_url",
+        "arch_config": """
+version: v0.1.0
+
+listeners:
+  egress_traffic:
+    address: 0.0.0.0
+    port: 12000
+    message_format: openai
+    timeout: 30s
+
+llm_providers:
+
+  - model: custom/gpt-4o
+    base_url: "http://custom.com:99999"
+    provider_interface: openai
+
+""",
+    },
+    {
+        "id": "base_url_port_not_numeric",
+        "expected_error": "Please provide a valid port (0-65535) in base_url",
+        "arch_config": """
+version: v0.1.0
+
+listeners:
+  egress_traffic:
+    address: 0.0.0.0
+    port: 12000
+    message_format: openai
+    timeout: 30s
+
+llm_providers:
+
+  - model: custom/gpt-4o
+    base_url: "http://custom.com:abc"
+    provider_interface: openai
+
+""",
+    },
+    {
+        "id": "base_url_port_with_letter",
+        "expected_error": "Please provide a valid port (0-65535) in base_url",
+        "arch_config": """
+version: v0.1.0
+
+listeners:
+  egress_traffic:
+    address: 0.0.0.0
+    port: 12000
+    message_format: openai
+    timeout: 30s
+
+llm_providers:
+
+  - model: custom/gpt-4o
+    base_url: "http://custom.com:8O"
+    provider_interface: openai
+
 """,
     },
     {
@@ -224,6 +363,31 @@ llm_providers:
 tracing:
   random_sampling: 100
 
+""",
+    },
+    {
+        "id": "duplicate_routing_preference_name_same_provider",
+        "expected_error": 'Duplicate routing preference name "code generation"',
+        "arch_config": """
+version: v0.1.0
+
+listeners:
+  egress_traffic:
+    address: 0.0.0.0
+    port: 12000
+    message_format: openai
+    timeout: 30s
+
+llm_providers:
+
+  - model: openai/gpt-4o
+    access_key: $OPENAI_API_KEY
+    routing_preferences:
+      - name: code generation
+        description: generating new code snippets
+      - name: code generation
+        description: generating boilerplate
+
 """,
     },
 ]
@@ -241,6 +405,7 @@ def test_validate_and_render_schema_tests(monkeypatch, arch_config_test_case):
     monkeypatch.setenv("ARCH_CONFIG_FILE_RENDERED", "fake_arch_config_rendered.yaml")
     monkeypatch.setenv("ENVOY_CONFIG_FILE_RENDERED", "fake_envoy.yaml")
     monkeypatch.setenv("TEMPLATE_ROOT", "../")
+    monkeypatch.setenv("ARCHGW_RENDER_CACHE_DIR", "")
 
     arch_config = arch_config_test_case["arch_config"]
     expected_error = arch_config_test_case["expected_error"]
@@ -253,11 +418,6 @@ def test_validate_and_render_schema_tests(monkeypatch, arch_config_test_case):
     m_open = mock.mock_open()
     # Provide enough file handles for all open() calls in validate_and_render_schema
     m_open.side_effect = [
-        mock.mock_open(read_data="").return_value,
-        mock.mock_open(read_data=arch_config).return_value,  # ARCH_CONFIG_FILE
-        mock.mock_open(
-            read_data=arch_config_schema
-        ).return_value,  # ARCH_CONFIG_SCHEMA_FILE
         mock.mock_open(read_data=arch_config).return_value,  # ARCH_CONFIG_FILE
         mock.mock_open(
             read_data=arch_config_schema
@@ -266,7 +426,192 @@ def test_validate_and_render_schema_tests(monkeypatch, arch_config_test_case):
         mock.mock_open().return_value,  # ARCH_CONFIG_FILE_RENDERED (write)
     ]
     with mock.patch("builtins.open", m_open):
-        with mock.patch("config_generator.Environment"):
+        with mock.patch("cli.config_generator.get_jinja_env"):
             with pytest.raises(Exception) as excinfo:
                 validate_and_render_schema()
             assert expected_error in str(excinfo.value)
+
+
+def test_get_schema_validator_is_cached():
+    with open("../arch_config_schema.yaml", "r") as file:
+        schema = file.read()
+
+    validator = get_schema_validator(schema)
+    assert get_schema_validator(schema) is validator
+
+
+def test_validate_prompt_config_raises_first_error():
+    with open("../arch_config_schema.yaml", "r") as file:
+        schema = file.read()
+
+    config = {"version": "v0.1.0", "tracing": {"random_sampling": "all"}}
+    with pytest.raises(ValidationError) as excinfo:
+        validate_prompt_config(config, schema)
+    assert "is not of type 'integer'" in str(excinfo.value)
+
+
+@pytest.mark.parametrize(
+    "endpoint, protocol, expected",
+    [
+        ("host.docker.internal:18083", "http", ("host.docker.internal", 18083)),
+        ("api.example.com", "http", ("api.example.com", 80)),
+        ("api.example.com", "https", ("api.example.com", 443)),
+        ("[::1]:8080", "http", ("[::1]", 8080)),
+    ],
+)
+def test_get_endpoint_and_port(endpoint, protocol, expected):
+    assert get_endpoint_and_port(endpoint, protocol) == expected
+
+
+@pytest.fixture
+def rendered_files(monkeypatch, tmp_path):
+    # render a real config from tmp_path with the checked-in schema and template
+    arch_config_file = tmp_path / "arch_config.yaml"
+    arch_config_file.write_text(
+        """
+version: v0.1.0
+
+llm_providers:
+
+  - model: openai/gpt-4o
+    access_key: $OPENAI_API_KEY
+"""
+    )
+    envoy_config_file = tmp_path / "envoy.yaml"
+    arch_config_rendered_file = tmp_path / "arch_config_rendered.yaml"
+
+    monkeypatch.setenv("ARCH_CONFIG_FILE", str(arch_config_file))
+    monkeypatch.setenv("ARCH_CONFIG_SCHEMA_FILE", "../arch_config_schema.yaml")
+    monkeypatch.setenv("ENVOY_CONFIG_TEMPLATE_FILE", "envoy.template.yaml")
+    monkeypatch.setenv("ARCH_CONFIG_FILE_RENDERED", str(arch_config_rendered_file))
+    monkeypatch.setenv("ENVOY_CONFIG_FILE_RENDERED", str(envoy_config_file))
+    monkeypatch.setenv("TEMPLATE_ROOT", "../")
+    monkeypatch.setenv("ARCHGW_RENDER_CACHE_DIR", "")
+    return envoy_config_file, arch_config_rendered_file
+
+
+def test_validate_and_render_uses_render_cache(monkeypatch, tmp_path, rendered_files):
+    envoy_config_file, arch_config_rendered_file = rendered_files
+    monkeypatch.setenv("ARCHGW_RENDER_CACHE_DIR", str(tmp_path / "cache"))
+
+    validate_and_render_schema()
+    envoy_config = envoy_config_file.read_text()
+    arch_config_rendered = arch_config_rendered_file.read_text()
+    envoy_config_file.unlink()
+    arch_config_rendered_file.unlink()
+
+    # second run with unchanged inputs must be served from the cache
+    with mock.patch("cli.config_generator.get_jinja_env") as get_jinja_env:
+        validate_and_render_schema()
+        get_jinja_env.assert_not_called()
+    assert envoy_config_file.read_text() == envoy_config
+    assert arch_config_rendered_file.read_text() == arch_config_rendered
+
+
+def test_get_private_cache_dir_rejects_shared_directory(tmp_path):
+    cache_dir = tmp_path / "cache"
+    assert get_private_cache_dir(str(cache_dir)) == str(cache_dir)
+    assert stat.S_IMODE(cache_dir.stat().st_mode) == 0o700
+
+    cache_dir.chmod(0o777)
+    assert get_private_cache_dir(str(cache_dir)) is None
+
+
+def test_validate_and_render_skips_unchanged_inputs(rendered_files):
+    envoy_config_file, _ = rendered_files
+
+    validate_and_render_schema()
+    assert envoy_config_file.exists()
+
+    with mock.patch("builtins.open") as m_open:
+        validate_and_render_schema()
+        m_open.assert_not_called()
+
+
+def test_validate_and_render_reloads_changed_template(
+    monkeypatch, tmp_path, rendered_files
+):
+    envoy_config_file, _ = rendered_files
+    template_file = tmp_path / "envoy.template.yaml"
+    template_file.write_text("v1: {{ agent_orchestrator }}")
+    monkeypatch.setenv("TEMPLATE_ROOT", str(tmp_path))
+
+    validate_and_render_schema()
+    assert envoy_config_file.read_text() == "v1: None"
+
+    template_file.write_text("version2: {{ agent_orchestrator }}")
+    validate_and_render_schema()
+    assert envoy_config_file.read_text() == "version2: None"
+
+
+@pytest.mark.parametrize(
+    "base_url, expected",
+    [
+        ("http://custom.com", ("http", "custom.com", 80)),
+        ("https://Custom.com:8443/", ("https", "custom.com", 8443)),
+        ("http://custom.com:", ("http", "custom.com", 80)),
+        ("http://[::1]:8080", ("http", "::1", 8080)),
+    ],
+)
+def test_validate_and_render_base_url(monkeypatch, rendered_files, base_url, expected):
+    envoy_config_file, arch_config_rendered_file = rendered_files
+    arch_config_file = envoy_config_file.parent / "arch_config.yaml"
+    arch_config_file.write_text(
+        f"""
+version: v0.1.0
+
+llm_providers:
+
+  - model: custom/gpt-4o
+    base_url: "{base_url}"
+    provider_interface: openai
+"""
+    )
+
+    validate_and_render_schema()
+    with open(arch_config_rendered_file, "r") as file:
+        llm_provider = yaml.safe_load(file.read())["llm_providers"][0]
+    assert (
+        llm_provider["protocol"],
+        llm_provider["endpoint"],
+        llm_provider["port"],
+    ) == expected
+
+
+def test_validate_and_render_keeps_envoy_config_on_render_error(
+    monkeypatch, tmp_path, rendered_files
+):
+    envoy_config_file, _ = rendered_files
+    envoy_config_file.write_text("previous config")
+    template_file = tmp_path / "envoy.template.yaml"
+    template_file.write_text("{{ arch_tracing.random_sampling.missing.attr }}")
+    monkeypatch.setenv("TEMPLATE_ROOT", str(tmp_path))
+
+    with pytest.raises(Exception):
+        validate_and_render_schema()
+    assert envoy_config_file.read_text() == "previous config"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "arch_config.yaml",
+        "envoy.template.yaml",
+        "envoy.yaml",
+    ]
+
+
+def test_validate_and_render_skips_render_cache_when_verbose(
+    monkeypatch, tmp_path, rendered_files, caplog
+):
+    monkeypatch.setenv("ARCHGW_RENDER_CACHE_DIR", str(tmp_path / "cache"))
+
+    with caplog.at_level(logging.DEBUG, logger="cli.config_generator"):
+        validate_and_render_schema()
+    assert not (tmp_path / "cache").exists()
+    assert "defined clusters from arch_config.yaml" in caplog.text
+
+
+def test_get_jinja_env_without_usable_bytecode_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(config_generator, "_jinja_envs", {})
+    with mock.patch(
+        "jinja2.FileSystemBytecodeCache", side_effect=RuntimeError("unsafe dir")
+    ):
+        env = get_jinja_env(str(tmp_path))
+    assert env.bytecode_cache is None